@@ -0,0 +1,303 @@
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, fields
+
+# Steam app id of The Binding of Isaac: Rebirth (and all its DLCs)
+ISAAC_APP_ID = "250900"
+
+# Every save file starts with this magic, followed by a format version
+SAVE_FILE_HEADER = b"ISAACNGSAVE"
+
+# i.e.: rep+persistentgamedata1.dat, rep_persistentgamedata2.dat
+SAVE_FILE_PATTERN = re.compile(
+    r"^(?P<prefix>[a-z+_]*)persistentgamedata(?P<profile>[1-3])\.dat$", re.IGNORECASE
+)
+
+INDEX_VERSION = 1
+
+# Coarsest timestamp resolution we expect (FAT volumes store mtimes in 2 s steps). A
+# file or folder modified this close to the time it was scanned may have changed again
+# in the same tick, so its cached state is not trusted (like git's "racily clean")
+TIMESTAMP_GRANULARITY_NS = 2_000_000_000
+
+
+class IndexFileError(Exception):
+    """The index file exists but is not a discovery index we can overwrite."""
+
+
+@dataclass
+class SaveFile:
+    path: str
+    prefix: str
+    profile: int
+    size: int
+    mtime_ns: int
+
+    @property
+    def is_repentance_plus(self):
+        return self.prefix.lower() == "rep+"
+
+
+# Types of the fields of a candidate entry in the index: a save file plus whether its
+# header was valid the last time it was checked
+CANDIDATE_FIELDS = {field.name: field.type for field in fields(SaveFile)}
+CANDIDATE_FIELDS["valid"] = bool
+
+
+def to_save_file(candidate):
+    """Build a SaveFile from a candidate entry of the index."""
+    return SaveFile(
+        **{key: candidate[key] for key in CANDIDATE_FIELDS if key != "valid"}
+    )
+
+
+def match_save_file_name(name):
+    """Return the name match if it looks like an Isaac save file, None otherwise."""
+    return SAVE_FILE_PATTERN.match(name)
+
+
+def has_save_file_header(path):
+    """Check the first bytes of the file against the save file magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SAVE_FILE_HEADER)) == SAVE_FILE_HEADER
+    except OSError:
+        return False
+
+
+def is_steam_account_dir(path):
+    """Check if path is a userdata/<SteamID3> folder."""
+    parent = os.path.basename(os.path.dirname(os.path.normpath(path)))
+    return parent.lower() == "userdata" and os.path.basename(path).isdigit()
+
+
+def is_racy(mtime_ns, scanned_ns):
+    """Check if something modified at mtime_ns may have changed unseen in a scan."""
+    return mtime_ns + TIMESTAMP_GRANULARITY_NS >= scanned_ns
+
+
+def is_valid_candidate(dir_path, candidate):
+    """Check a candidate entry read from the index belongs to the dir_path entry."""
+    return (
+        isinstance(candidate, dict)
+        and candidate.keys() == CANDIDATE_FIELDS.keys()
+        and all(
+            isinstance(candidate[key], value_type)
+            for key, value_type in CANDIDATE_FIELDS.items()
+        )
+        and os.path.dirname(candidate["path"]) == dir_path
+        and match_save_file_name(os.path.basename(candidate["path"])) is not None
+    )
+
+
+def is_valid_dir_entry(dir_path, entry):
+    """Check the shape of the dir_path entry read from the index."""
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("mtime_ns"), int)
+        and isinstance(entry.get("scanned_ns"), int)
+        and isinstance(entry.get("subdirs"), list)
+        and all(isinstance(subdir, str) for subdir in entry["subdirs"])
+        and isinstance(entry.get("candidates"), list)
+        and all(
+            is_valid_candidate(dir_path, candidate)
+            for candidate in entry["candidates"]
+        )
+    )
+
+
+def load_index(index_file):
+    """Load a discovery index from disk, returning an empty one if there is no file.
+
+    Raises IndexFileError if the file exists but is not a discovery index, so it is
+    never overwritten by save_index.
+    """
+    if index_file is None or not os.path.exists(index_file):
+        return {}
+    try:
+        with open(index_file, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise IndexFileError(f"{index_file} is not a valid index file: {e}")
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != INDEX_VERSION
+        or not isinstance(data.get("dirs"), dict)
+    ):
+        raise IndexFileError(f"{index_file} is not a valid index file")
+
+    # The index is only a cache, malformed entries are just scanned again
+    return {
+        path: entry
+        for path, entry in data["dirs"].items()
+        if is_valid_dir_entry(path, entry)
+    }
+
+
+def save_index(index_file, index):
+    """Write a discovery index to disk, raising OSError if it can not be written."""
+    tmp_file = f"{index_file}.tmp"
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump({"version": INDEX_VERSION, "dirs": index}, f)
+        os.replace(tmp_file, index_file)
+    except OSError:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def _check_candidate(path, match, stat, previous, scanned_ns):
+    """Build a candidate entry, reusing the header check if the file did not change.
+
+    scanned_ns is when the previous candidate entry was checked.
+    """
+    if (
+        previous is not None
+        and previous["size"] == stat.st_size
+        and previous["mtime_ns"] == stat.st_mtime_ns
+        and not is_racy(stat.st_mtime_ns, scanned_ns)
+    ):
+        valid = previous["valid"]
+    else:
+        valid = has_save_file_header(path)
+
+    return {
+        "path": path,
+        "prefix": match.group("prefix"),
+        "profile": int(match.group("profile")),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "valid": valid,
+    }
+
+
+def _scan_dir(path, dir_mtime_ns, cached):
+    """List a directory, reusing header checks of unchanged files from the cache."""
+    scanned_ns = time.time_ns()
+    cached_candidates = {}
+    cached_scanned_ns = 0
+    if cached is not None:
+        cached_candidates = {
+            candidate["path"]: candidate for candidate in cached["candidates"]
+        }
+        cached_scanned_ns = cached["scanned_ns"]
+
+    account_dir = is_steam_account_dir(path)
+    subdirs = []
+    candidates = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    # Inside a steam account only Isaac's app folder is relevant
+                    if account_dir and entry.name != ISAAC_APP_ID:
+                        continue
+                    subdirs.append(entry.name)
+                    continue
+                match = match_save_file_name(entry.name)
+                if match is None or not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            candidates.append(
+                _check_candidate(
+                    entry.path,
+                    match,
+                    stat,
+                    cached_candidates.get(entry.path),
+                    cached_scanned_ns,
+                )
+            )
+
+    return {
+        "mtime_ns": dir_mtime_ns,
+        "scanned_ns": scanned_ns,
+        "subdirs": sorted(subdirs),
+        "candidates": candidates,
+    }
+
+
+def _refresh_cached_entry(cached):
+    """Re-stat known candidates of an unchanged dir (in-place writes keep its mtime)."""
+    scanned_ns = time.time_ns()
+    candidates = []
+    for candidate in cached["candidates"]:
+        try:
+            stat = os.stat(candidate["path"])
+        except OSError:
+            continue
+        match = match_save_file_name(os.path.basename(candidate["path"]))
+        candidates.append(
+            _check_candidate(
+                candidate["path"], match, stat, candidate, cached["scanned_ns"]
+            )
+        )
+    return {**cached, "scanned_ns": scanned_ns, "candidates": candidates}
+
+
+def discover_save_files(root, index=None, max_depth=8, full_rescan=False):
+    """Find all Isaac save files under root.
+
+    Directories whose mtime did not change since the last scan recorded in index are
+    not listed again, only the save files known in them are re-checked. The index
+    dict is updated in place with the directories visited, so it can be persisted
+    with save_index and passed again on the next scan. With full_rescan every
+    directory is listed and every save file header is checked again.
+    """
+    if index is None:
+        index = {}
+
+    found = []
+    visited = set()
+    pending = [(os.path.abspath(root), 0)]
+
+    while pending:
+        path, depth = pending.pop()
+        try:
+            dir_mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        visited.add(path)
+
+        cached = index.get(path)
+        if full_rescan or not is_valid_dir_entry(path, cached):
+            cached = None
+
+        if (
+            cached is not None
+            and cached["mtime_ns"] == dir_mtime_ns
+            and not is_racy(dir_mtime_ns, cached["scanned_ns"])
+        ):
+            entry = _refresh_cached_entry(cached)
+        else:
+            try:
+                entry = _scan_dir(path, dir_mtime_ns, cached)
+            except OSError:
+                index.pop(path, None)
+                continue
+        index[path] = entry
+
+        found.extend(
+            to_save_file(candidate)
+            for candidate in entry["candidates"]
+            if candidate["valid"]
+        )
+
+        if depth < max_depth:
+            for subdir in entry["subdirs"]:
+                pending.append((os.path.join(path, subdir), depth + 1))
+
+    # Forget directories under root that no longer exist
+    root_prefix = os.path.join(os.path.abspath(root), "")
+    for path in list(index):
+        if path not in visited and (
+            path.startswith(root_prefix) or path == os.path.abspath(root)
+        ):
+            del index[path]
+
+    return sorted(found, key=lambda save: (save.path, save.profile))
@@ -1,6 +1,8 @@
 import argparse
+import os
 
 import ObtainData
+import SaveDiscovery
 
 
 def read_save_file(filename):
@@ -9,15 +11,19 @@ def read_save_file(filename):
         return f.read()
 
 
-def main():
-
-    parser = argparse.ArgumentParser(description="CLI for the application")
-
-    parser.add_argument(
-        "-f", "--file", type=str, help="Path to the file to be processed", required=True
+def print_banner():
+    """Print the app title."""
+    print(
+        """
+          #######################################################
+          # The Binding of Isaac: Repentance Completion Tracker #
+          #######################################################
+          """
     )
 
-    file_path = parser.parse_args().file
+
+def print_progress(file_path):
+    """Parse a save file and print its remaining unlocks."""
     save_data = read_save_file(file_path)
 
     all_df = ObtainData.run_data_parser(save_data)
@@ -29,19 +35,104 @@ def main():
     # # Sort by quality and completed (show first not completed)
     all_df = all_df.sort_values(by=["Completed", "Quality"], ascending=[True, False])
 
-    print(
-        """
-          #######################################################
-          # The Binding of Isaac: Repentance Completion Tracker #
-          #######################################################
-          """
-    )
-
+    print(f"Save file: {file_path}")
     print("Showing first 20 entries:")
     print("\n")
 
     print(all_df.head(20))
 
 
+def main():
+
+    parser = argparse.ArgumentParser(description="CLI for the application")
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "-f", "--file", type=str, help="Path to the file to be processed"
+    )
+    source.add_argument(
+        "-d",
+        "--directory",
+        type=str,
+        help="Folder to search for save files, i.e.: your Steam userdata folder",
+    )
+    parser.add_argument(
+        "-i",
+        "--index",
+        type=str,
+        help="File to keep the search index in, only rescans changed folders (with -d)",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        type=int,
+        choices=[1, 2, 3],
+        help="Only show this profile (with -d)",
+    )
+    parser.add_argument(
+        "-r",
+        "--rescan",
+        action="store_true",
+        help="Search every folder again instead of trusting the index (with -d)",
+    )
+
+    args = parser.parse_args()
+
+    if args.file is not None:
+        if args.index is not None:
+            parser.error("argument -i/--index: not allowed with argument -f/--file")
+        if args.profile is not None:
+            parser.error("argument -p/--profile: not allowed with argument -f/--file")
+        if args.rescan:
+            parser.error("argument -r/--rescan: not allowed with argument -f/--file")
+
+        print_banner()
+        print_progress(args.file)
+        return
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"argument -d/--directory: {args.directory} is not a folder")
+
+    index = {}
+    if args.index is not None:
+        index_dir = os.path.dirname(os.path.abspath(args.index))
+        if not os.path.isdir(index_dir) or not os.access(index_dir, os.W_OK):
+            parser.error(f"argument -i/--index: can not write to folder {index_dir}")
+        try:
+            index = SaveDiscovery.load_index(args.index)
+        except SaveDiscovery.IndexFileError as e:
+            parser.error(f"argument -i/--index: {e}")
+
+    save_files = SaveDiscovery.discover_save_files(
+        args.directory, index, full_rescan=args.rescan
+    )
+
+    if args.index is not None:
+        try:
+            SaveDiscovery.save_index(args.index, index)
+        except OSError as e:
+            print(f"Warning: could not save the index file {args.index}. Error: {e}")
+
+    save_files = [
+        save_file
+        for save_file in save_files
+        if save_file.is_repentance_plus
+        and (args.profile is None or save_file.profile == args.profile)
+    ]
+
+    if not save_files:
+        print(f"No Repentance+ save files found under {args.directory}")
+        return
+
+    print_banner()
+    for save_file in save_files:
+        try:
+            print_progress(save_file.path)
+        except Exception as e:
+            print(f"Save file: {save_file.path}")
+            print(f"Failed to process the save file. Error: {e}")
+            print("\n")
+
+
 if __name__ == "__main__":
     main()
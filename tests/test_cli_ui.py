@@ -0,0 +1,153 @@
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+import SaveDiscovery
+
+CLI_PATH = os.path.join(os.path.dirname(__file__), "..", "src", "cli-ui.py")
+
+VALID_SAVE = b"ISAACNGSAVE09R" + b"\x00" * 16
+
+
+class FakeDataFrame:
+    def __init__(self, save_data):
+        self.save_data = save_data
+
+    def sort_values(self, **kwargs):
+        return self
+
+    def head(self, n):
+        return f"<unlocks of {self.save_data!r}>"
+
+
+def fake_run_data_parser(save_data):
+    if b"BROKEN" in save_data:
+        raise IndexError("broken save")
+    return FakeDataFrame(save_data)
+
+
+@pytest.fixture
+def cli(monkeypatch):
+    """Load cli-ui.py with ObtainData.run_data_parser stubbed out."""
+    obtain_data = types.ModuleType("ObtainData")
+    obtain_data.run_data_parser = fake_run_data_parser
+    monkeypatch.setitem(sys.modules, "ObtainData", obtain_data)
+
+    spec = importlib.util.spec_from_file_location("cli_ui", CLI_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_main(cli, monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["cli-ui.py", *args])
+    cli.main()
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.fixture
+def remote_dir(tmp_path):
+    remote = tmp_path / "userdata" / "123" / SaveDiscovery.ISAAC_APP_ID / "remote"
+    write_file(str(remote / "rep+persistentgamedata1.dat"), VALID_SAVE + b"one")
+    write_file(str(remote / "rep+persistentgamedata2.dat"), VALID_SAVE + b"two")
+    write_file(str(remote / "rep_persistentgamedata3.dat"), VALID_SAVE + b"three")
+    return remote
+
+
+@pytest.mark.parametrize(
+    "extra_args", [["-i", "index.json"], ["-p", "2"], ["-r"], ["-d", "."]]
+)
+def test_file_mode_rejects_directory_options(cli, monkeypatch, capsys, extra_args):
+    with pytest.raises(SystemExit) as e:
+        run_main(cli, monkeypatch, "-f", "save.dat", *extra_args)
+
+    assert e.value.code == 2
+    assert "not allowed with argument -f/--file" in capsys.readouterr().err
+
+
+def test_directory_mode_shows_only_repentance_plus_saves(
+    cli, monkeypatch, capsys, tmp_path, remote_dir
+):
+    run_main(cli, monkeypatch, "-d", str(tmp_path))
+
+    out = capsys.readouterr().out
+    assert out.count("Completion Tracker") == 1
+    assert "rep+persistentgamedata1.dat" in out
+    assert "rep+persistentgamedata2.dat" in out
+    assert "rep_persistentgamedata3.dat" not in out
+
+
+def test_directory_mode_filters_profile(cli, monkeypatch, capsys, tmp_path, remote_dir):
+    run_main(cli, monkeypatch, "-d", str(tmp_path), "-p", "2")
+
+    out = capsys.readouterr().out
+    assert "rep+persistentgamedata1.dat" not in out
+    assert "rep+persistentgamedata2.dat" in out
+
+
+def test_batch_keeps_going_after_a_failed_save(
+    cli, monkeypatch, capsys, tmp_path, remote_dir
+):
+    write_file(str(remote_dir / "rep+persistentgamedata1.dat"), VALID_SAVE + b"BROKEN")
+
+    run_main(cli, monkeypatch, "-d", str(tmp_path))
+
+    out = capsys.readouterr().out
+    assert "Failed to process the save file. Error: broken save" in out
+    assert "<unlocks of " in out and "two" in out
+
+
+@pytest.mark.parametrize("missing", ["missing", "file.txt"])
+def test_directory_must_be_a_folder(cli, monkeypatch, capsys, tmp_path, missing):
+    write_file(str(tmp_path / "file.txt"), b"")
+
+    with pytest.raises(SystemExit) as e:
+        run_main(cli, monkeypatch, "-d", str(tmp_path / missing))
+
+    assert e.value.code == 2
+    assert "is not a folder" in capsys.readouterr().err
+
+
+def test_index_in_missing_folder_is_rejected(
+    cli, monkeypatch, capsys, tmp_path, remote_dir
+):
+    index_file = str(tmp_path / "nodir" / "index.json")
+
+    with pytest.raises(SystemExit) as e:
+        run_main(cli, monkeypatch, "-d", str(tmp_path), "-i", index_file)
+
+    assert e.value.code == 2
+    assert "can not write to folder" in capsys.readouterr().err
+
+
+def test_index_save_failure_still_shows_results(
+    cli, monkeypatch, capsys, tmp_path, remote_dir
+):
+    def fail_save_index(index_file, index):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(SaveDiscovery, "save_index", fail_save_index)
+    run_main(cli, monkeypatch, "-d", str(tmp_path), "-i", str(tmp_path / "i.json"))
+
+    out = capsys.readouterr().out
+    assert "Warning: could not save the index file" in out
+    assert "rep+persistentgamedata1.dat" in out
+
+
+def test_non_index_file_is_rejected(cli, monkeypatch, capsys, tmp_path, remote_dir):
+    notes = tmp_path / "notes.txt"
+    write_file(str(notes), b"my notes")
+
+    with pytest.raises(SystemExit):
+        run_main(cli, monkeypatch, "-d", str(tmp_path), "-i", str(notes))
+
+    assert "is not a valid index file" in capsys.readouterr().err
+    assert notes.read_bytes() == b"my notes"
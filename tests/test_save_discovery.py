@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import SaveDiscovery
+
+VALID_SAVE = b"ISAACNGSAVE09R" + b"\x00" * 16
+
+# Old enough to not be racy compared to the scan time
+OLD_MTIME_NS = 1_000_000_000_000_000_000
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def found_profiles(root, index, **kwargs):
+    save_files = SaveDiscovery.discover_save_files(root, index, **kwargs)
+    return [save.profile for save in save_files]
+
+
+def age_tree(root):
+    """Set every folder and file mtime under root to OLD_MTIME_NS."""
+    for dir_path, dir_names, file_names in os.walk(root):
+        for name in file_names:
+            os.utime(os.path.join(dir_path, name), ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+        os.utime(dir_path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+@pytest.fixture
+def remote_dir(tmp_path):
+    remote = tmp_path / "userdata" / "123" / SaveDiscovery.ISAAC_APP_ID / "remote"
+    write_file(str(remote / "rep+persistentgamedata1.dat"), VALID_SAVE)
+    return remote
+
+
+def test_rescan_of_unchanged_dirs_does_not_list_them(tmp_path, remote_dir, monkeypatch):
+    age_tree(str(tmp_path))
+    index = {}
+    assert found_profiles(str(tmp_path), index) == [1]
+
+    def fail_scandir(path):
+        raise AssertionError(f"{path} was listed again")
+
+    monkeypatch.setattr(SaveDiscovery.os, "scandir", fail_scandir)
+    assert found_profiles(str(tmp_path), index) == [1]
+
+
+def test_save_written_in_place_is_found(tmp_path, remote_dir):
+    save_path = str(remote_dir / "rep+persistentgamedata3.dat")
+    write_file(save_path, b"")
+    age_tree(str(tmp_path))
+
+    index = {}
+    assert found_profiles(str(tmp_path), index) == [1]
+
+    # Writing in place keeps the mtime of the directory
+    with open(save_path, "r+b") as f:
+        f.write(VALID_SAVE)
+    os.utime(str(remote_dir), ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+    assert found_profiles(str(tmp_path), index) == [1, 3]
+
+
+def test_deleted_subdir_is_pruned_from_index(tmp_path, remote_dir):
+    local_dir = tmp_path / "local"
+    write_file(str(local_dir / "rep+persistentgamedata2.dat"), VALID_SAVE)
+
+    index = {}
+    assert found_profiles(str(tmp_path), index) == [2, 1]
+    assert str(local_dir) in index
+
+    shutil.rmtree(str(local_dir))
+
+    assert found_profiles(str(tmp_path), index) == [1]
+    assert str(local_dir) not in index
+
+
+def test_save_name_with_bad_header_is_ignored(tmp_path, remote_dir):
+    write_file(str(remote_dir / "rep+persistentgamedata2.dat"), b"not a save file")
+
+    assert found_profiles(str(tmp_path), {}) == [1]
+
+
+def test_other_apps_in_steam_account_are_skipped(tmp_path, remote_dir):
+    other_app = tmp_path / "userdata" / "123" / "440" / "remote"
+    write_file(str(other_app / "rep+persistentgamedata2.dat"), VALID_SAVE)
+
+    index = {}
+    assert found_profiles(str(tmp_path), index) == [1]
+    assert not any(path.startswith(str(other_app)) for path in index)
+
+
+def test_save_added_in_the_same_tick_as_the_scan_is_found(tmp_path, remote_dir):
+    index = {}
+    assert found_profiles(str(tmp_path), index) == [1]
+
+    # The folder changes without its mtime moving, as on coarse timestamp volumes
+    dir_mtime_ns = os.stat(str(remote_dir)).st_mtime_ns
+    write_file(str(remote_dir / "rep+persistentgamedata2.dat"), VALID_SAVE)
+    os.utime(str(remote_dir), ns=(dir_mtime_ns, dir_mtime_ns))
+
+    assert found_profiles(str(tmp_path), index) == [1, 2]
+
+
+def test_full_rescan_ignores_cached_listing(tmp_path, remote_dir):
+    age_tree(str(tmp_path))
+    index = {}
+    assert found_profiles(str(tmp_path), index) == [1]
+
+    write_file(str(remote_dir / "rep+persistentgamedata2.dat"), VALID_SAVE)
+    age_tree(str(tmp_path))
+
+    assert found_profiles(str(tmp_path), index) == [1]
+    assert found_profiles(str(tmp_path), index, full_rescan=True) == [1, 2]
+
+
+def test_index_file_round_trip(tmp_path, remote_dir):
+    index_file = str(tmp_path / "index.json")
+
+    for _ in range(2):
+        index = SaveDiscovery.load_index(index_file)
+        assert found_profiles(str(tmp_path / "userdata"), index) == [1]
+        SaveDiscovery.save_index(index_file, index)
+    assert SaveDiscovery.load_index(index_file) == index
+
+
+def test_failed_index_save_leaves_no_tmp_file(tmp_path):
+    index_file = str(tmp_path / "index.json")
+    os.mkdir(index_file)
+
+    with pytest.raises(OSError):
+        SaveDiscovery.save_index(index_file, {})
+
+    assert not os.path.exists(f"{index_file}.tmp")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"some notes", b"\xff\xfe\x00binary", b"[]", b'{"version": 0, "dirs": {}}'],
+)
+def test_non_index_file_is_not_overwritten(tmp_path, remote_dir, content):
+    index_file = str(tmp_path / "notes.txt")
+    write_file(index_file, content)
+
+    with pytest.raises(SaveDiscovery.IndexFileError):
+        SaveDiscovery.load_index(index_file)
+
+    with open(index_file, "rb") as f:
+        assert f.read() == content
+
+
+def candidate_entry(path):
+    return {
+        "path": path,
+        "prefix": "rep+",
+        "profile": 2,
+        "size": 1,
+        "mtime_ns": 1,
+        "valid": True,
+    }
+
+
+@pytest.mark.parametrize(
+    "candidate",
+    [
+        {"path": "x", "extra": 1},
+        # Not a save file name
+        candidate_entry(os.path.join("{remote}", "notes.py")),
+        # Not in the folder of its entry
+        candidate_entry(os.path.join("{other}", "rep+persistentgamedata2.dat")),
+    ],
+)
+def test_malformed_index_entries_are_rescanned(tmp_path, remote_dir, candidate):
+    age_tree(str(tmp_path))
+    remote = str(remote_dir)
+    other = str(tmp_path / "other")
+    write_file(os.path.join(remote, "notes.py"), b"print()")
+    write_file(os.path.join(other, "rep+persistentgamedata2.dat"), VALID_SAVE)
+    age_tree(str(tmp_path))
+    if "path" in candidate:
+        candidate["path"] = candidate["path"].format(remote=remote, other=other)
+
+    index_file = str(tmp_path / "index.json")
+    dirs = {
+        str(tmp_path / "userdata"): [],
+        str(tmp_path / "userdata" / "123"): {"subdirs": []},
+        remote: {
+            "mtime_ns": OLD_MTIME_NS,
+            "scanned_ns": OLD_MTIME_NS + 10 * SaveDiscovery.TIMESTAMP_GRANULARITY_NS,
+            "subdirs": [],
+            "candidates": [candidate],
+        },
+    }
+    with open(index_file, "w") as f:
+        json.dump({"version": SaveDiscovery.INDEX_VERSION, "dirs": dirs}, f)
+
+    index = SaveDiscovery.load_index(index_file)
+    assert remote not in index
+    assert found_profiles(str(tmp_path / "userdata"), index) == [1]
+
+    # Malformed entries passed in memory are rescanned too
+    assert found_profiles(str(tmp_path / "userdata"), dirs) == [1]